@@ -285,6 +285,65 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+CREATE OR REPLACE FUNCTION expire_posts(subreddit_names TEXT[], time_filter_param TEXT, cutoff TIMESTAMP)
+RETURNS INTEGER AS $$
+DECLARE
+    deleted_count INTEGER;
+BEGIN
+    -- Only the count is returned, not the deleted rows
+    DELETE FROM posts
+    WHERE subreddit = ANY(subreddit_names)
+    AND time_filter = time_filter_param
+    AND created_utc < cutoff;
+    
+    GET DIAGNOSTICS deleted_count = ROW_COUNT;
+    RETURN deleted_count;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION incremental_prep(subreddit_names TEXT[], time_filter_param TEXT, cutoff TIMESTAMP)
+RETURNS TABLE(
+    latest_created_utc TIMESTAMP,
+    deleted_count INTEGER
+) AS $$
+DECLARE
+    removed INTEGER;
+BEGIN
+    -- Remove expired posts and read the newest remaining post in one round-trip
+    removed := expire_posts(subreddit_names, time_filter_param, cutoff);
+    
+    RETURN QUERY
+    SELECT 
+        MAX(p.created_utc) as latest_created_utc,
+        removed as deleted_count
+    FROM posts p
+    WHERE p.subreddit = ANY(subreddit_names)
+    AND p.time_filter = time_filter_param;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION posts_freshness(subreddit_names TEXT[], time_filters TEXT[])
+RETURNS TABLE(
+    subreddit TEXT,
+    time_filter TEXT,
+    post_count INTEGER,
+    latest_created_utc TIMESTAMP
+) AS $$
+BEGIN
+    -- Post count and newest post per subreddit, without shipping the posts
+    RETURN QUERY
+    SELECT 
+        p.subreddit::TEXT,
+        p.time_filter::TEXT,
+        COUNT(*)::INTEGER as post_count,
+        MAX(p.created_utc) as latest_created_utc
+    FROM posts p
+    WHERE p.subreddit = ANY(subreddit_names)
+    AND p.time_filter = ANY(time_filters)
+    GROUP BY p.subreddit, p.time_filter;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Create Performance Indexes (at the end)
 CREATE INDEX idx_posts_subreddit ON posts(subreddit);
 CREATE INDEX idx_posts_created_utc ON posts(created_utc);
@@ -18,10 +18,11 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.popularity_ranker import PopularityRankerV2
+from utils import reddit_circuit
 from classifiers.entertainment_classifier import EntertainmentClassifier
 # Comment fetcher removed - now using live comment API
 from services.enhanced_database_service import get_enhanced_db_service
-from services.fixed_database_service import save_posts_basic_schema
+from services.fixed_database_service import save_posts_basic_schema, compact_posts_frame
 from utils.optimized_entertainment_sentiment_analyzer import OptimizedEntertainmentSentimentAnalyzer
 
 load_dotenv()
@@ -57,6 +58,12 @@ class EntertainmentDatabaseExtractor:
         self.classifier = EntertainmentClassifier()
         self.sentiment_analyzer = OptimizedEntertainmentSentimentAnalyzer()
         self.db_service = get_enhanced_db_service()
+        # Frame from the most recent extract_and_save_to_database run, so
+        # pipelines can derive daily data without re-reading the database.
+        # Already stored ids are skipped during extraction, so the frame only
+        # holds the whole period when nothing was stored before the run.
+        self.last_posts_df = pd.DataFrame()
+        self.last_posts_complete = False
         
         # Target minimums for each category
         self.category_minimums = {
@@ -99,10 +106,10 @@ class EntertainmentDatabaseExtractor:
         extraction_start = datetime.now()
         
         # Check if posts already exist for this time period
-        existing_posts = self.db_service.get_posts_by_domain('entertainment', time_filter)
-        existing_ids = set(existing_posts['id'].tolist()) if not existing_posts.empty else set()
+        existing_ids = self.db_service.get_post_ids_by_domain('entertainment', time_filter)
         
         print(f"📊 Found {len(existing_ids)} existing posts in database")
+        self.last_posts_complete = not existing_ids
         
         # Extract posts for each category
         all_posts = []
@@ -140,6 +147,7 @@ class EntertainmentDatabaseExtractor:
             time.sleep(2)
         
         if not all_posts:
+            self.last_posts_df = pd.DataFrame()
             print("❌ No posts extracted!")
             return {
                 'total_posts': 0,
@@ -157,6 +165,8 @@ class EntertainmentDatabaseExtractor:
         # Add computed fields
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
+        self.last_posts_df = compact_posts_frame(posts_df)
+        
         # Save to database
         print(f"\n💾 Saving to Supabase database...")
         save_result = save_posts_basic_schema(posts_df)
@@ -226,7 +236,8 @@ class EntertainmentDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"✅ Extracted {len(posts_df)} new entertainment posts")
@@ -246,6 +257,8 @@ class EntertainmentDatabaseExtractor:
         cutoff_time = (datetime.utcnow() - (timedelta(days=7) if time_filter == 'week' else timedelta(days=1))).timestamp()
         
         for subreddit_name in key_subreddits:
+            reddit_circuit.check('entertainment')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -294,6 +307,7 @@ class EntertainmentDatabaseExtractor:
                 print(f"   ✅ {subreddit_name}: {posts_added} posts")
                 
             except Exception as e:
+                reddit_circuit.record_failure('entertainment', e)
                 print(f"   ⚠️  Error with {subreddit_name}: {e}")
                 continue
         
@@ -301,7 +315,8 @@ class EntertainmentDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"⚡ Fast entertainment update complete: {len(posts_df)} posts")
@@ -312,6 +327,8 @@ class EntertainmentDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('entertainment')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -356,6 +373,7 @@ class EntertainmentDatabaseExtractor:
                 time.sleep(3)  # Rate limiting
                 
             except Exception as e:
+                reddit_circuit.record_failure('entertainment', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
@@ -366,6 +384,8 @@ class EntertainmentDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('entertainment')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -415,6 +435,7 @@ class EntertainmentDatabaseExtractor:
                 time.sleep(5)
                 
             except Exception as e:
+                reddit_circuit.record_failure('entertainment', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
@@ -18,10 +18,11 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.popularity_ranker import PopularityRankerV2
+from utils import reddit_circuit
 from classifiers.finance_classifier import FinanceClassifier
 # Comment fetcher removed - now using live comment API
 from services.enhanced_database_service import get_enhanced_db_service
-from services.fixed_database_service import save_posts_basic_schema
+from services.fixed_database_service import save_posts_basic_schema, compact_posts_frame
 from utils.sentiment_analyzer import StockSentimentAnalyzer
 
 load_dotenv()
@@ -56,6 +57,12 @@ class FinanceDatabaseExtractor:
         self.classifier = FinanceClassifier()
         self.sentiment_analyzer = StockSentimentAnalyzer()
         self.db_service = get_enhanced_db_service()
+        # Frame from the most recent extract_and_save_to_database run, so
+        # pipelines can derive daily data without re-reading the database.
+        # Already stored ids are skipped during extraction, so the frame only
+        # holds the whole period when nothing was stored before the run.
+        self.last_posts_df = pd.DataFrame()
+        self.last_posts_complete = False
         
         # Target minimums for each category
         self.category_minimums = {
@@ -98,10 +105,10 @@ class FinanceDatabaseExtractor:
         extraction_start = datetime.now()
         
         # Check if posts already exist for this time period
-        existing_posts = self.db_service.get_posts_by_domain('finance', time_filter)
-        existing_ids = set(existing_posts['id'].tolist()) if not existing_posts.empty else set()
+        existing_ids = self.db_service.get_post_ids_by_domain('finance', time_filter)
         
         print(f"📊 Found {len(existing_ids)} existing posts in database")
+        self.last_posts_complete = not existing_ids
         
         # Extract posts for each category
         all_posts = []
@@ -141,6 +148,7 @@ class FinanceDatabaseExtractor:
             time.sleep(2)
         
         if not all_posts:
+            self.last_posts_df = pd.DataFrame()
             print("❌ No posts extracted!")
             return {
                 'total_posts': 0,
@@ -158,6 +166,8 @@ class FinanceDatabaseExtractor:
         # Add computed fields
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
+        self.last_posts_df = compact_posts_frame(posts_df)
+        
         # Save to database
         print(f"\n💾 Saving to Supabase database...")
         save_result = save_posts_basic_schema(posts_df)
@@ -229,7 +239,8 @@ class FinanceDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"✅ Extracted {len(posts_df)} new finance posts")
@@ -249,6 +260,8 @@ class FinanceDatabaseExtractor:
         cutoff_time = (datetime.utcnow() - (timedelta(days=7) if time_filter == 'week' else timedelta(days=1))).timestamp()
         
         for subreddit_name in key_subreddits:
+            reddit_circuit.check('finance')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -297,6 +310,7 @@ class FinanceDatabaseExtractor:
                 print(f"   ✅ {subreddit_name}: {posts_added} posts")
                 
             except Exception as e:
+                reddit_circuit.record_failure('finance', e)
                 print(f"   ⚠️  Error with {subreddit_name}: {e}")
                 continue
         
@@ -304,7 +318,8 @@ class FinanceDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"⚡ Fast finance update complete: {len(posts_df)} posts")
@@ -315,6 +330,8 @@ class FinanceDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('finance')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -359,6 +376,7 @@ class FinanceDatabaseExtractor:
                 time.sleep(3)  # Rate limiting
                 
             except Exception as e:
+                reddit_circuit.record_failure('finance', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
@@ -369,6 +387,8 @@ class FinanceDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('finance')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -418,6 +438,7 @@ class FinanceDatabaseExtractor:
                 time.sleep(5)
                 
             except Exception as e:
+                reddit_circuit.record_failure('finance', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
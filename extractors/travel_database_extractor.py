@@ -18,10 +18,11 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.popularity_ranker import PopularityRankerV2
+from utils import reddit_circuit
 from classifiers.travel_classifier import TravelClassifier
 # Comment fetcher removed - now using live comment API
 from services.enhanced_database_service import get_enhanced_db_service
-from services.fixed_database_service import save_posts_basic_schema
+from services.fixed_database_service import save_posts_basic_schema, compact_posts_frame
 from utils.travel_sentiment_analyzer import TravelSentimentAnalyzer
 from utils.travel_city_tracker import TravelCityTracker
 
@@ -61,6 +62,12 @@ class TravelDatabaseExtractor:
         self.sentiment_analyzer = TravelSentimentAnalyzer()
         self.city_tracker = TravelCityTracker()
         self.db_service = get_enhanced_db_service()
+        # Frame from the most recent extract_and_save_to_database run, so
+        # pipelines can derive daily data without re-reading the database.
+        # Already stored ids are skipped during extraction, so the frame only
+        # holds the whole period when nothing was stored before the run.
+        self.last_posts_df = pd.DataFrame()
+        self.last_posts_complete = False
         
         # Target minimums for each category
         self.category_minimums = {
@@ -101,10 +108,10 @@ class TravelDatabaseExtractor:
         extraction_start = datetime.now()
         
         # Check if posts already exist for this time period
-        existing_posts = self.db_service.get_posts_by_domain('travel', time_filter)
-        existing_ids = set(existing_posts['id'].tolist()) if not existing_posts.empty else set()
+        existing_ids = self.db_service.get_post_ids_by_domain('travel', time_filter)
         
         print(f"📊 Found {len(existing_ids)} existing posts in database")
+        self.last_posts_complete = not existing_ids
         
         # Extract posts for each category
         all_posts = []
@@ -150,6 +157,7 @@ class TravelDatabaseExtractor:
             time.sleep(2)
         
         if not all_posts:
+            self.last_posts_df = pd.DataFrame()
             print("❌ No posts extracted!")
             return {
                 'total_posts': 0,
@@ -167,6 +175,8 @@ class TravelDatabaseExtractor:
         # Add computed fields
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
+        self.last_posts_df = compact_posts_frame(posts_df)
+        
         # Save to database
         print(f"\n💾 Saving to Supabase database...")
         save_result = save_posts_basic_schema(posts_df)
@@ -242,7 +252,8 @@ class TravelDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"✅ Extracted {len(posts_df)} new travel posts")
@@ -262,6 +273,8 @@ class TravelDatabaseExtractor:
         cutoff_time = (datetime.utcnow() - (timedelta(days=7) if time_filter == 'week' else timedelta(days=1))).timestamp()
         
         for subreddit_name in key_subreddits:
+            reddit_circuit.check('travel')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -310,6 +323,7 @@ class TravelDatabaseExtractor:
                 print(f"   ✅ {subreddit_name}: {posts_added} posts")
                 
             except Exception as e:
+                reddit_circuit.record_failure('travel', e)
                 print(f"   ⚠️  Error with {subreddit_name}: {e}")
                 continue
         
@@ -317,7 +331,8 @@ class TravelDatabaseExtractor:
             return pd.DataFrame()
         
         # Same processing pipeline as full extraction
-        posts_df = pd.DataFrame(all_posts)
+        # (overlapping subreddit fetches can return the same post more than once)
+        posts_df = pd.DataFrame(all_posts).drop_duplicates(subset='id', keep='first')
         posts_df = self._add_computed_fields(posts_df, time_filter)
         
         print(f"⚡ Fast travel update complete: {len(posts_df)} posts")
@@ -328,6 +343,8 @@ class TravelDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('travel')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -372,6 +389,7 @@ class TravelDatabaseExtractor:
                 time.sleep(2)  # Rate limiting (shorter for travel due to more subreddits)
                 
             except Exception as e:
+                reddit_circuit.record_failure('travel', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
@@ -382,6 +400,8 @@ class TravelDatabaseExtractor:
         category_posts = []
         
         for subreddit_name in subreddits:
+            reddit_circuit.check('travel')
+            
             try:
                 subreddit = self.reddit.subreddit(subreddit_name)
                 
@@ -431,6 +451,7 @@ class TravelDatabaseExtractor:
                 time.sleep(5)
                 
             except Exception as e:
+                reddit_circuit.record_failure('travel', e)
                 print(f"   ⚠️  Error processing {subreddit_name}: {e}")
                 continue
         
@@ -5,6 +5,7 @@ Dashboard and logging models
 
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 import pandas as pd
 import json
@@ -191,16 +192,24 @@ class DashboardQuery(BaseQuery):
         if not self._domain or not self._time_filter:
             return DashboardStats()
         
-        # Get posts for the domain and time filter
         from .post import PostQuery
-        posts_df = PostQuery(self.db).by_domain(self._domain).by_time_filter(self._time_filter).execute()
+        from .sentiment import SentimentQuery
+        
+        # Posts and sentiment summary are independent queries - run them together
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            posts_future = executor.submit(
+                PostQuery(self.db).by_domain(self._domain).by_time_filter(self._time_filter).execute
+            )
+            sentiment_future = executor.submit(
+                SentimentQuery(self.db).by_domain(self._domain).sentiment_summary
+            )
+            posts_df = posts_future.result()
+            sentiment_summary = sentiment_future.result()
         
         # Generate stats from posts
         stats = DashboardStats.from_posts_dataframe(posts_df, self._domain, self._time_filter)
         
         # Add sentiment summary if available
-        from .sentiment import SentimentQuery
-        sentiment_summary = SentimentQuery(self.db).by_domain(self._domain).sentiment_summary()
         stats.sentiment_summary = sentiment_summary
         
         return stats
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Shared Pipeline Runner
+Runs pipeline steps as child processes for the generate-all-data scripts
+"""
+
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+def run_command(command: List[str], description: str) -> bool:
+    """
+    Run a pipeline step and handle errors
+    
+    Args:
+        command: Argument list; a leading 'python' is replaced with the current interpreter
+        description: Human-readable step name for logging
+        
+    Returns:
+        True if the step exited successfully
+    """
+    print(f"\n🚀 {description}")
+    print("=" * 60)
+    
+    # Run without a shell - avoids forking an extra /bin/sh per step
+    if command and command[0] == 'python':
+        command = [sys.executable] + list(command[1:])
+    
+    try:
+        subprocess.run(command, shell=False, check=True, capture_output=False)
+        print(f"✅ {description} completed successfully")
+        return True
+    except subprocess.CalledProcessError as e:
+        print(f"❌ {description} failed with error code: {e.returncode}")
+        return False
+    except Exception as e:
+        print(f"❌ Unexpected error during {description}: {e}")
+        return False
+
+
+def _port_in_use(port: int) -> bool:
+    """Check whether something is accepting connections on a local port"""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+            return True
+    except OSError:
+        return False
+
+def _wait_for_port(process: subprocess.Popen, port: int, timeout: float) -> bool:
+    """Poll until the service accepts connections, backing off between attempts"""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False  # Exited before it started listening
+        if _port_in_use(port):
+            # Only ours if the child is still alive after the connect
+            return process.poll() is None
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+    return False
+
+def start_service(command: List[str], port: int, description: str, timeout: float = 10.0) -> bool:
+    """
+    Start a background service and wait until it is listening
+    
+    Args:
+        command: Argument list; a leading 'python' is replaced with the current interpreter
+        port: Local port the service binds when ready
+        description: Human-readable service name for logging
+        timeout: Seconds to wait for the port before giving up on the probe
+        
+    Returns:
+        True if the service is running
+    """
+    if command and command[0] == 'python':
+        command = [sys.executable] + list(command[1:])
+    
+    # A stale instance on the port would make the readiness probe pass
+    if _port_in_use(port):
+        print(f"❌ {description} not started: port {port} is already in use")
+        return False
+    
+    try:
+        # stderr goes to a temp file, not a pipe - a long-running service
+        # would block once an unread pipe buffer fills up. The child keeps its
+        # own handle, so ours is closed once startup has been checked.
+        with tempfile.TemporaryFile() as error_log:
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=error_log)
+            
+            if _wait_for_port(process, port, timeout):
+                print(f"✅ {description} started on http://localhost:{port}")
+                return True
+            
+            if process.poll() is None:  # Still running, just slow to bind
+                print(f"⚠️  {description} running but not yet listening on port {port}")
+                return True
+            
+            print(f"❌ {description} failed to start")
+            error_log.seek(0)
+            stderr = error_log.read()
+            if stderr:
+                print(f"   Error: {stderr.decode(errors='replace')}")
+            return False
+    except Exception as e:
+        print(f"❌ Error starting {description}: {e}")
+        return False
@@ -181,13 +181,13 @@ class RedditSummarizer:
     
     def prepare_posts_for_summary(self, df, category, domain='finance'):
         """Intelligently prepare posts within TPM constraints while maximizing analysis"""
-        category_posts = df[df['category'] == category].copy()
+        category_posts = df[df['category'] == category]
         
         if len(category_posts) == 0:
             return None, 0
         
-        # Sort by popularity for intelligent selection and limit to top 50 posts
-        category_posts = category_posts.sort_values('popularity_score', ascending=False).head(50)
+        # Select the top 50 posts by popularity (partial selection, no full sort)
+        category_posts = category_posts.nlargest(50, 'popularity_score')
         
         # Smart token management: use ~4500 tokens for content (leaving 1500 for prompt/response)
         target_content_tokens = 4500
@@ -195,23 +195,29 @@ class RedditSummarizer:
         posts_text = []
         posts_analyzed = 0
         
-        for _, post in category_posts.iterrows():
+        # Plain dicts instead of a Series per row; only the needed columns
+        summary_columns = [col for col in ('title', 'selftext', 'top_comments') if col in category_posts.columns]
+        summary_posts = category_posts[summary_columns].copy()
+        
+        # Truncate very long content for all posts at once to manage tokens efficiently
+        if 'selftext' in summary_posts.columns:
+            content = summary_posts['selftext'].fillna('').astype(str)
+            too_long = content.str.len() > 2000  # ~500 tokens
+            summary_posts['selftext'] = content.where(~too_long, content.str.slice(0, 2000) + "... [truncated]")
+        
+        for post in summary_posts.to_dict('records'):
             title = post['title']
-            content = str(post.get('selftext', ''))
+            content = post.get('selftext', '')
             
             # Create post summary
             post_summary = f"Title: {title}"
             if content and content != 'nan' and len(content) > 10:
-                # Truncate very long content to manage tokens efficiently
-                if len(content) > 2000:  # ~500 tokens
-                    content = content[:2000] + "... [truncated]"
                 post_summary += f"\nContent: {content}"
             
             # Add top comments if available
             top_comments = post.get('top_comments', '[]')
             if top_comments and top_comments != '[]':
                 try:
-                    import json
                     comments_data = json.loads(top_comments)
                     if comments_data:
                         post_summary += f"\nTop Comments:"
@@ -381,6 +387,17 @@ class RedditSummarizer:
                 'time_filter': time_filter
             }
 
+# Global summarizer instance - the Groq client and database service are
+# reused across API requests instead of being rebuilt per request
+_summarizer = None
+
+def get_summarizer() -> RedditSummarizer:
+    """Get global summarizer instance"""
+    global _summarizer
+    if _summarizer is None:
+        _summarizer = RedditSummarizer()
+    return _summarizer
+
 # Flask API for dashboard integration
 app = Flask(__name__)
 CORS(app)  # Allow requests from dashboard
@@ -397,7 +414,7 @@ def summarize_category():
             return jsonify({'success': False, 'error': 'Category is required'}), 400
         
         # Initialize summarizer (you'll need to set GROQ_API_KEY environment variable)
-        summarizer = RedditSummarizer()
+        summarizer = get_summarizer()
         result = summarizer.generate_summary(category, time_filter)
         
         return jsonify(result)
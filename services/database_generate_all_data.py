@@ -4,28 +4,16 @@ Database-First Generate All Data Script
 Complete data generation using pure Supabase operations - no CSV dependencies
 """
 
-import subprocess
 import sys
 import time
 import pandas as pd
 import os
 from datetime import datetime, timedelta
 
-def run_command(command, description):
-    """Run a command and handle errors"""
-    print(f"\n🚀 {description}")
-    print("=" * 60)
-    
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=False)
-        print(f"✅ {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed with error code: {e.returncode}")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error during {description}: {e}")
-        return False
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services._pipeline_runner import run_command, start_service
 
 def main():
     """Generate all data using database-first approach"""
@@ -41,7 +29,7 @@ def main():
     
     # Step 1: Run Database Unified Pipeline (Weekly)
     print(f"\n📋 Step 1/5: Weekly Database Extraction")
-    if run_command("python services/database_unified_pipeline.py week", "Weekly Database Extraction"):
+    if run_command(["python", "services/database_unified_pipeline.py", "week"], "Weekly Database Extraction"):
         success_count += 1
     else:
         print("⚠️  Weekly extraction failed - continuing anyway...")
@@ -52,33 +40,21 @@ def main():
     
     # Step 2: Run Database Unified Pipeline (Daily)
     print(f"\n📋 Step 2/5: Daily Database Extraction")
-    if run_command("python services/database_unified_pipeline.py day", "Daily Database Extraction"):
+    if run_command(["python", "services/database_unified_pipeline.py", "day"], "Daily Database Extraction"):
         success_count += 1
     else:
         print("⚠️  Daily extraction failed - continuing anyway...")
     
     # Step 3: Generate Pure Database Dashboard
     print(f"\n📋 Step 3/5: Pure Database Dashboard Generation")
-    if run_command("python utils/original_style_database_dashboard.py", "Pure Database Dashboard Generation"):
+    if run_command(["python", "utils/original_style_database_dashboard.py"], "Pure Database Dashboard Generation"):
         success_count += 1
     
     # Step 4: Start Comment API Service (background)
     print("\n📋 Step 4/5: Starting Comment API Service")
     print("=" * 60)
-    try:
-        comment_process = subprocess.Popen(
-            [sys.executable, "utils/live_comment_fetcher.py"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        time.sleep(2)  # Give it time to start
-        if comment_process.poll() is None:  # Still running
-            print("✅ Comment API Service started on http://localhost:5001")
-            success_count += 1
-        else:
-            print("❌ Comment API Service failed to start")
-    except Exception as e:
-        print(f"❌ Error starting Comment API: {e}")
+    if start_service(["python", "utils/live_comment_fetcher.py"], 5001, "Comment API Service"):
+        success_count += 1
     
     # Step 5: Start AI Summarizer Service (background)
     print("\n📋 Step 5/5: Starting AI Summarizer Service")
@@ -90,24 +66,8 @@ def main():
         print("   Please set it before running: export GROQ_API_KEY='your-key-here'")
         print("   AI Summarizer will not work without this key")
     else:
-        try:
-            ai_process = subprocess.Popen(
-                [sys.executable, "services/ai_summarizer.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            time.sleep(3)  # Give it more time to start
-            if ai_process.poll() is None:  # Still running
-                print("✅ AI Summarizer Service started on http://localhost:5002")
-                success_count += 1
-            else:
-                # Get error output
-                stdout, stderr = ai_process.communicate()
-                print("❌ AI Summarizer Service failed to start")
-                if stderr:
-                    print(f"   Error: {stderr.decode()}")
-        except Exception as e:
-            print(f"❌ Error starting AI Summarizer: {e}")
+        if start_service(["python", "services/ai_summarizer.py"], 5002, "AI Summarizer Service"):
+            success_count += 1
     
     # Summary
     end_time = datetime.now()
@@ -9,9 +9,69 @@ import pandas as pd
 from supabase import create_client, Client
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
 load_dotenv()
 
+# PostgREST returns at most this many rows per request (Supabase default)
+_PAGE_SIZE = 1000
+
+# Free-text post columns held as Arrow-backed strings when pyarrow is installed
+# (less memory than object columns, vectorized .str operations)
+try:
+    import pyarrow  # noqa: F401
+    _ARROW_STRINGS = True
+except ImportError:
+    _ARROW_STRINGS = False
+
+_TEXT_COLUMNS = ('title', 'selftext', 'author', 'subreddit', 'url', 'link_flair_text')
+
+# HTTP pool shared by every thread using a Supabase client; sized above the
+# default so parallel domain extractors don't queue for connections
+_POOL_SIZE = int(os.getenv('SUPABASE_POOL_SIZE', '16'))
+_POSTGREST_TIMEOUT = float(os.getenv('SUPABASE_POSTGREST_TIMEOUT', '30'))
+
+# HTTP/2 needs the optional h2 package; plain keep-alive HTTP/1.1 otherwise
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    from supabase.lib.client_options import SyncClientOptions as _ClientOptions
+except ImportError:
+    from supabase.lib.client_options import ClientOptions as _ClientOptions
+
+def _create_client(supabase_url: str, supabase_key: str) -> Client:
+    """Create a Supabase client backed by one pooled keep-alive HTTP session"""
+    options = _ClientOptions(postgrest_client_timeout=_POSTGREST_TIMEOUT)
+    if hasattr(options, 'httpx_client'):
+        import httpx
+        options.httpx_client = httpx.Client(
+            limits=httpx.Limits(max_connections=_POOL_SIZE, max_keepalive_connections=_POOL_SIZE),
+            timeout=_POSTGREST_TIMEOUT,
+            follow_redirects=True,
+            http2=_HTTP2
+        )
+    # Older supabase-py has no httpx_client option and builds its own session
+    return create_client(supabase_url, supabase_key, options=options)
+
+def _posts_frame(rows: list) -> pd.DataFrame:
+    """
+    Build a posts DataFrame from PostgREST rows
+    
+    Missing text (e.g. selftext of link posts) is filled with '' - dashboards
+    use `value or ''` and str(value), which break on pd.NA
+    """
+    posts_df = pd.DataFrame(rows)
+    for col in _TEXT_COLUMNS:
+        if col in posts_df.columns:
+            if _ARROW_STRINGS:
+                posts_df[col] = posts_df[col].astype('string[pyarrow]')
+            posts_df[col] = posts_df[col].fillna('')
+    return posts_df
+
 class DatabaseService:
     """Basic database service for Supabase operations"""
     
@@ -25,11 +85,11 @@ class DatabaseService:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment")
         
         # Use anon key for reads
-        self.supabase: Client = create_client(supabase_url, supabase_anon_key)
+        self.supabase: Client = _create_client(supabase_url, supabase_anon_key)
         
         # Use service key for writes if available (bypasses RLS)
         if supabase_service_key:
-            self.supabase_service: Client = create_client(supabase_url, supabase_service_key)
+            self.supabase_service: Client = _create_client(supabase_url, supabase_service_key)
             print("INFO:services.database_service:Database service initialized with Supabase (service key available for writes)")
         else:
             self.supabase_service = self.supabase
@@ -50,7 +110,7 @@ class DatabaseService:
             result = query.execute()
             
             if result.data:
-                return pd.DataFrame(result.data)
+                return _posts_frame(result.data)
             else:
                 return pd.DataFrame()
                 
@@ -58,6 +118,109 @@ class DatabaseService:
             print(f"Error getting {domain} posts: {e}")
             return pd.DataFrame()
     
+    def get_post_ids_by_domain(self, domain: str, time_filter: str) -> set:
+        """Get the ids of all stored posts for a domain and time filter (id column only)"""
+        try:
+            ids = set()
+            start = 0
+            while True:
+                result = self.supabase.table('posts').select('id').in_('subreddit', self._get_domain_subreddits(domain)).eq('time_filter', time_filter).order('id').range(start, start + _PAGE_SIZE - 1).execute()
+                page = result.data or []
+                ids.update(row['id'] for row in page)
+                if len(page) < _PAGE_SIZE:
+                    break
+                start += _PAGE_SIZE
+            return ids
+            
+        except Exception as e:
+            print(f"Error getting {domain} post ids: {e}")
+            return set()
+    
+    def get_posts_by_domains(self, domains: List[str], time_filters: List[str]) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        Get posts for several domains and time filters in one query
+        
+        Returns:
+            Dict keyed by (domain, time_filter), each sorted by popularity like get_posts_by_domain
+        """
+        subreddit_domains = {
+            subreddit: domain
+            for domain in domains
+            for subreddit in self._get_domain_subreddits(domain)
+        }
+        empty = {(domain, time_filter): pd.DataFrame() for domain in domains for time_filter in time_filters}
+        
+        try:
+            # One filtered query, paged past the PostgREST row cap
+            rows = []
+            start = 0
+            while True:
+                result = self.supabase.table('posts').select('*').in_('subreddit', list(subreddit_domains)).in_('time_filter', time_filters).order('popularity_score', desc=True).order('id').range(start, start + _PAGE_SIZE - 1).execute()
+                page = result.data or []
+                rows.extend(page)
+                if len(page) < _PAGE_SIZE:
+                    break
+                start += _PAGE_SIZE
+            
+            if not rows:
+                return empty
+            
+            # Split client-side by domain and time filter
+            posts_df = _posts_frame(rows)
+            domain_keys = posts_df['subreddit'].map(subreddit_domains)
+            posts = dict(empty)
+            for (domain, time_filter), group in posts_df.groupby([domain_keys, posts_df['time_filter']], sort=False):
+                if (domain, time_filter) in posts:
+                    posts[(domain, time_filter)] = group.reset_index(drop=True)
+            return posts
+            
+        except Exception as e:
+            print(f"Error getting posts for {', '.join(domains)}: {e}")
+            return empty
+    
+    def get_freshness_summary(self, domains: List[str], time_filters: List[str]) -> Dict[Tuple[str, str], Tuple[int, Optional[str]]]:
+        """
+        Get post count and newest created_utc per domain and time filter
+        
+        Uses the posts_freshness RPC (see database/schema.sql) so no posts are
+        transferred; falls back to loading the posts if it is not deployed yet.
+        
+        Returns:
+            Dict keyed by (domain, time_filter) of (post_count, latest_created_utc)
+        """
+        subreddit_domains = {
+            subreddit: domain
+            for domain in domains
+            for subreddit in self._get_domain_subreddits(domain)
+        }
+        summary = {(domain, time_filter): (0, None) for domain in domains for time_filter in time_filters}
+        
+        try:
+            result = self.supabase.rpc('posts_freshness', {
+                'subreddit_names': list(subreddit_domains),
+                'time_filters': time_filters
+            }).execute()
+            
+            # Roll per-subreddit rows up to their domain
+            for row in result.data or []:
+                key = (subreddit_domains.get(row['subreddit']), row['time_filter'])
+                if key not in summary:
+                    continue
+                count, latest = summary[key]
+                row_latest = row.get('latest_created_utc')
+                if row_latest and (latest is None or row_latest > latest):
+                    latest = row_latest
+                summary[key] = (count + (row.get('post_count') or 0), latest)
+            return summary
+            
+        except Exception:
+            # Function not deployed - derive the summary from the posts themselves
+            posts = self.get_posts_by_domains(domains, time_filters)
+            for key, posts_df in posts.items():
+                if not posts_df.empty and 'created_utc' in posts_df.columns:
+                    summary[key] = (len(posts_df), posts_df['created_utc'].max())
+            return summary
+    
     def _get_domain_subreddits(self, domain: str) -> list:
         """Get subreddit list for domain"""
         
@@ -101,6 +264,13 @@ class DatabaseService:
         else:
             return []
 
+# Global instance - keeps the Supabase clients (and their pooled
+# keep-alive HTTP sessions) alive across calls
+_db_service = None
+
 def get_db_service():
     """Get database service instance"""
-    return DatabaseService()
\ No newline at end of file
+    global _db_service
+    if _db_service is None:
+        _db_service = DatabaseService()
+    return _db_service
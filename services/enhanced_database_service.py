@@ -8,7 +8,9 @@ import os
 import sys
 import pandas as pd
 import json
+import threading
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any
 
 # Add project root to path  
@@ -19,6 +21,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Maximum values per PostgREST in_() filter - keeps request URLs short
+_IN_CHUNK_SIZE = 100
+
+def _parse_top_comments(value):
+    """Decode top_comments stored as a JSON list string, leave anything else as-is"""
+    if isinstance(value, str) and value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
 class EnhancedDatabaseService(DatabaseService):
     """
     Enhanced database service that supports computed fields
@@ -48,6 +62,28 @@ class EnhancedDatabaseService(DatabaseService):
         
         return handler()
     
+    def _select_in_chunks(self, columns: str, field: str, values: List[Any], max_workers: int = 4) -> List[Dict]:
+        """
+        Select rows where field is in values, splitting large lists into chunks
+        
+        PostgREST encodes in_() filters into the URL, so long ID lists are sent as
+        several small requests run concurrently and their rows combined.
+        """
+        chunks = [values[i:i + _IN_CHUNK_SIZE] for i in range(0, len(values), _IN_CHUNK_SIZE)]
+        
+        def fetch(chunk):
+            result = self.read_client.table('posts').select(columns).in_(field, chunk).execute()
+            return result.data or []
+        
+        if len(chunks) <= 1:
+            return fetch(chunks[0]) if chunks else []
+        
+        rows = []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+            for chunk_rows in executor.map(fetch, chunks):
+                rows.extend(chunk_rows)
+        return rows
+    
     def _check_computed_fields_support(self):
         """Check if computed fields are supported in current schema"""
         try:
@@ -67,13 +103,16 @@ class EnhancedDatabaseService(DatabaseService):
                 self.computed_fields_supported = False
                 logger.info("⚠️  Computed fields not yet supported - using basic schema")
     
-    def insert_posts_with_computed_fields(self, posts_df: pd.DataFrame, batch_size: int = 50) -> Dict[str, Any]:
+    def insert_posts_with_computed_fields(self, posts_df: pd.DataFrame, batch_size: int = 50,
+                                          ignore_duplicates: bool = False) -> Dict[str, Any]:
         """
         Insert posts with computed fields, adapting to current schema
         
         Args:
             posts_df: DataFrame with all post data including computed fields
             batch_size: Number of posts per batch
+            ignore_duplicates: Skip posts whose id already exists (ON CONFLICT DO NOTHING)
+                instead of updating them; only newly inserted rows are counted
             
         Returns:
             Dictionary with insertion statistics
@@ -109,59 +148,60 @@ class EnhancedDatabaseService(DatabaseService):
             
             logger.info(f"📊 Processing {total_posts} posts for database insertion")
             
+            # Serialize datetime columns to ISO strings once (vectorized) instead of per row
+            datetime_columns = [
+                col for col in posts_df.columns
+                if col in base_columns and pd.api.types.is_datetime64_any_dtype(posts_df[col])
+            ]
+            if datetime_columns:
+                posts_df = posts_df.copy()
+                for col in datetime_columns:
+                    values = posts_df[col]
+                    # Keep microseconds and the UTC offset, as Timestamp.isoformat() did
+                    offset = ''
+                    if values.dt.tz is not None:
+                        values = values.dt.tz_convert('UTC')
+                        offset = '+00:00'
+                    posts_df[col] = (values.dt.strftime('%Y-%m-%dT%H:%M:%S.%f') + offset).where(values.notna(), None)
+            
+            # Build all records columnar: keep known columns, parse JSON comments,
+            # then let pandas' C serializer turn NaN into null and numpy scalars
+            # into plain JSON values instead of walking every row in Python
+            record_columns = [
+                col for col in posts_df.columns
+                if col in base_columns or col in computed_fields_mapping
+            ]
+            records_df = posts_df[record_columns].copy()
+            
+            if 'top_comments' in records_df.columns:
+                records_df['top_comments'] = records_df['top_comments'].map(_parse_top_comments)
+            
+            # Ensure required fields are present
+            if 'id' not in records_df.columns and 'post_id' in posts_df.columns:
+                records_df['id'] = posts_df['post_id']
+            
+            now_iso = datetime.now().isoformat()
+            for col in ('extracted_at', 'updated_at'):
+                if col not in records_df.columns:
+                    records_df[col] = now_iso
+            
+            all_records = json.loads(records_df.to_json(orient='records', date_format='iso'))
+            
             # Process in batches
             for i in range(0, total_posts, batch_size):
-                batch_df = posts_df.iloc[i:i + batch_size]
-                batch_records = []
-                
-                for _, row in batch_df.iterrows():
-                    # Start with base record
-                    record = {}
-                    
-                    # Add base columns that exist in current schema
-                    for col in base_columns:
-                        if col in row:
-                            value = row[col]
-                            if pd.isna(value):
-                                record[col] = None
-                            elif isinstance(value, (pd.Timestamp, datetime)):
-                                record[col] = value.isoformat() if hasattr(value, 'isoformat') else str(value)
-                            else:
-                                record[col] = value
-                    
-                    # Handle computed fields - try individual columns first (simpler approach)
-                    for df_col, db_field in computed_fields_mapping.items():
-                        if df_col in row and pd.notna(row[df_col]):
-                            value = row[df_col]
-                            # Handle JSON serializable values for top_comments
-                            if df_col == 'top_comments' and isinstance(value, str):
-                                try:
-                                    record[db_field] = json.loads(value) if value.startswith('[') else value
-                                except:
-                                    record[db_field] = value
-                            else:
-                                record[db_field] = value
-                    
-                    # Ensure required fields are present
-                    if 'id' not in record and 'post_id' in row:
-                        record['id'] = row['post_id']
-                    
-                    if 'extracted_at' not in record:
-                        record['extracted_at'] = datetime.now().isoformat()
-                    
-                    if 'updated_at' not in record:
-                        record['updated_at'] = datetime.now().isoformat()
-                    
-                    batch_records.append(record)
+                batch_records = all_records[i:i + batch_size]
                 
                 # Insert batch
                 try:
                     result = self.write_client.table('posts').upsert(
                         batch_records,
-                        on_conflict='id'
+                        on_conflict='id',
+                        ignore_duplicates=ignore_duplicates,
+                        count='exact',
+                        returning='minimal'
                     ).execute()
                     
-                    batch_count = len(result.data) if result.data else 0
+                    batch_count = result.count or 0
                     inserted_count += batch_count
                     
                     logger.info(f"✅ Batch {i//batch_size + 1}: {batch_count} posts processed")
@@ -181,10 +221,13 @@ class EnhancedDatabaseService(DatabaseService):
                             
                             result = self.write_client.table('posts').upsert(
                                 base_records,
-                                on_conflict='id'
+                                on_conflict='id',
+                                ignore_duplicates=ignore_duplicates,
+                                count='exact',
+                                returning='minimal'
                             ).execute()
                             
-                            batch_count = len(result.data) if result.data else 0
+                            batch_count = result.count or 0
                             inserted_count += batch_count
                             error_count -= len(batch_records)  # Correct the error count
                             
@@ -195,9 +238,13 @@ class EnhancedDatabaseService(DatabaseService):
             
             success_rate = (inserted_count / total_posts * 100) if total_posts > 0 else 0
             
+            # With ignore_duplicates only inserted rows come back; the rest already existed
+            skipped_count = max(total_posts - inserted_count - error_count, 0) if ignore_duplicates else 0
+            
             return {
                 'total_posts': total_posts,
                 'inserted_count': inserted_count,
+                'skipped_count': skipped_count,
                 'error_count': error_count,
                 'success_rate': success_rate,
                 'computed_fields_supported': self.computed_fields_supported
@@ -229,15 +276,13 @@ class EnhancedDatabaseService(DatabaseService):
                     # Try to get computed fields for these posts
                     post_ids = posts_df['id'].tolist()
                     
-                    # Query with computed fields
-                    result = self.read_client.table('posts').select(
-                        'id, computed_fields'
-                    ).in_('id', post_ids).execute()
+                    # Query with computed fields (chunked to keep the in_() filter small)
+                    computed_rows = self._select_in_chunks('id, computed_fields', 'id', post_ids)
                     
-                    if result.data:
+                    if computed_rows:
                         # Create lookup for computed fields
                         computed_lookup = {}
-                        for post in result.data:
+                        for post in computed_rows:
                             if post.get('computed_fields'):
                                 computed_lookup[post['id']] = post['computed_fields']
                         
@@ -324,21 +369,25 @@ class EnhancedDatabaseService(DatabaseService):
                 'write_connection': False
             }
 
-# Global enhanced service instance
+# Global enhanced service instance - one set of Supabase clients (and HTTP
+# pools) for every thread; the lock stops concurrent first calls building extras
 _enhanced_db_service = None
+_enhanced_db_service_lock = threading.Lock()
 
 def get_enhanced_db_service() -> EnhancedDatabaseService:
     """Get global enhanced database service instance"""
     global _enhanced_db_service
     if _enhanced_db_service is None:
-        _enhanced_db_service = EnhancedDatabaseService()
+        with _enhanced_db_service_lock:
+            if _enhanced_db_service is None:
+                _enhanced_db_service = EnhancedDatabaseService()
     return _enhanced_db_service
 
 # Convenience functions
-def save_posts_with_computed_fields(posts_df: pd.DataFrame) -> Dict[str, Any]:
+def save_posts_with_computed_fields(posts_df: pd.DataFrame, ignore_duplicates: bool = False) -> Dict[str, Any]:
     """Save posts with computed fields to database"""
     db = get_enhanced_db_service()
-    return db.insert_posts_with_computed_fields(posts_df)
+    return db.insert_posts_with_computed_fields(posts_df, ignore_duplicates=ignore_duplicates)
 
 def get_posts_with_computed_fields(domain: str, time_filter: str = 'week') -> pd.DataFrame:
     """Get posts with computed fields from database"""
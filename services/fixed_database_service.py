@@ -4,32 +4,73 @@ Fixed Database Service - Strips computed fields to match actual database schema
 Ensures new posts can be inserted without schema errors
 """
 
+import threading
 import pandas as pd
 from typing import Dict, Any
 from services.enhanced_database_service import get_enhanced_db_service, save_posts_with_computed_fields
 
-def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
+# Use Arrow-backed strings when pyarrow is installed (faster .str operations)
+try:
+    import pyarrow  # noqa: F401
+    _TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _TEXT_DTYPE = 'string'
+
+# Free-text columns sanitized with vectorized string operations
+_TEXT_COLUMNS = ('title', 'selftext', 'url', 'link_flair_text', 'author', 'subreddit')
+
+# Maximum stored length for free-text columns; oversized values are truncated
+# before insert so a single long row cannot fail its whole batch
+# (VARCHAR limits from the posts table in database/schema.sql; title, url and
+# selftext are TEXT and unbounded)
+_MAX_LENS = {
+    'subreddit': 50,
+    'author': 50,
+    'link_flair_text': 100
+}
+
+# Serializes inserts across extractor threads; concurrent writers only contend
+# for the same pooled connections, while schema filtering stays parallel
+_WRITE_LOCK = threading.Lock()
+
+# Rows per bulk insert request - each batch is one multi-row INSERT, so larger
+# batches mean fewer round trips while staying well under request size limits
+_INSERT_BATCH_SIZE = 500
+
+# Columns stored in the posts table (based on actual Supabase table)
+_DATABASE_COLUMNS = (
+    'id', 'subreddit', 'title', 'author', 'score', 'upvote_ratio',
+    'num_comments', 'created_utc', 'url', 'selftext', 'link_flair_text',
+    'category_id', 'classification_confidence', 'popularity_score',
+    'engagement_ratio', 'time_bonus', 'time_filter', 'extracted_at', 'updated_at'
+)
+
+# Timestamp columns sent to Supabase as ISO-8601 strings
+_TIMESTAMP_COLUMNS = ('created_utc', 'extracted_at', 'updated_at')
+
+# Global fixed service instance (reuses the Supabase client and its HTTP session)
+_db_service = None
+
+def save_posts_basic_schema(posts_df: pd.DataFrame, time_filter: str = None) -> Dict[str, Any]:
     """
     Save posts using only the columns that exist in the database
     Strips out computed fields that cause schema errors
+    
+    Args:
+        posts_df: Posts to save (left unmodified)
+        time_filter: Stored for every post instead of posts_df['time_filter'] if given
     """
     
     if posts_df.empty:
         return {'inserted_count': 0, 'error_count': 0}
     
-    # Database schema columns (based on actual Supabase table)
-    database_columns = {
-        'id', 'subreddit', 'title', 'author', 'score', 'upvote_ratio',
-        'num_comments', 'created_utc', 'url', 'selftext', 'link_flair_text',
-        'category_id', 'classification_confidence', 'popularity_score',
-        'engagement_ratio', 'time_bonus', 'time_filter', 'extracted_at', 'updated_at'
-    }
-    
     print(f"📊 Filtering posts to match database schema...")
     print(f"   Original columns: {len(posts_df.columns)}")
     
     # Keep only columns that exist in database
     filtered_df = posts_df.copy()
+    if time_filter:
+        filtered_df['time_filter'] = time_filter
     
     # Remove computed fields that don't exist in database
     computed_fields_to_remove = [
@@ -44,6 +85,17 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
             filtered_df = filtered_df.drop(columns=[field])
             print(f"   Removed computed field: {field}")
     
+    # Convert text columns to a native string dtype for vectorized sanitization
+    for col in _TEXT_COLUMNS:
+        if col in filtered_df.columns:
+            filtered_df[col] = filtered_df[col].astype(_TEXT_DTYPE)
+    
+    # datetime64 columns (as built by the extractors) format to ISO in one pass
+    for col in _TIMESTAMP_COLUMNS:
+        if col in filtered_df.columns and pd.api.types.is_datetime64_any_dtype(filtered_df[col]):
+            iso = filtered_df[col].dt.strftime('%Y-%m-%dT%H:%M:%S')
+            filtered_df[col] = iso.astype(object).where(iso.notna(), None)
+    
     # Convert created_utc timestamps to ISO format if needed
     if 'created_utc' in filtered_df.columns:
         def convert_timestamp(ts):
@@ -75,8 +127,13 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
         if field in filtered_df.columns:
             filtered_df[field] = pd.to_numeric(filtered_df[field], errors='coerce').fillna(0.0)
     
+    # Truncate oversized text fields to fit the database columns
+    for col, max_len in _MAX_LENS.items():
+        if col in filtered_df.columns:
+            filtered_df[col] = filtered_df[col].str.slice(0, max_len)
+    
     # Ensure all required columns have appropriate defaults
-    for col in database_columns:
+    for col in _DATABASE_COLUMNS:
         if col not in filtered_df.columns:
             if col in ['extracted_at', 'updated_at']:
                 from datetime import datetime
@@ -93,19 +150,25 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
                 filtered_df[col] = None
     
     # Keep only database columns
-    final_columns = [col for col in database_columns if col in filtered_df.columns]
+    final_columns = [col for col in _DATABASE_COLUMNS if col in filtered_df.columns]
     filtered_df = filtered_df[final_columns]
     
+    # Back to plain Python strings so records serialize with None for missing values
+    for col in _TEXT_COLUMNS:
+        if col in filtered_df.columns:
+            filtered_df[col] = filtered_df[col].astype(object).where(filtered_df[col].notna(), None)
+    
     print(f"   Final columns: {len(filtered_df.columns)}")
     print(f"   Posts to insert: {len(filtered_df)}")
     
     # Use the database service to insert
     try:
-        db_service = get_enhanced_db_service()
+        db_service = get_fixed_db_service()
         
         # Insert in batches to avoid timeout
-        batch_size = 50
+        batch_size = _INSERT_BATCH_SIZE
         total_inserted = 0
+        total_skipped = 0
         total_errors = 0
         
         for i in range(0, len(filtered_df), batch_size):
@@ -115,13 +178,21 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
                 # Convert to records for Supabase
                 records = batch.to_dict('records')
                 
-                # Insert batch
-                result = db_service.supabase_service.table('posts').insert(records).execute()
+                # Insert batch, skipping posts that are already stored so one
+                # existing id doesn't fail the whole batch
+                with _WRITE_LOCK:
+                    result = db_service.supabase_service.table('posts').upsert(
+                        records, on_conflict='id', ignore_duplicates=True,
+                        count='exact', returning='minimal'
+                    ).execute()
                 
-                batch_inserted = len(result.data) if result.data else 0
+                batch_inserted = result.count or 0
                 total_inserted += batch_inserted
+                # Only inserted rows are counted; the rest already existed
+                batch_skipped = len(records) - batch_inserted
+                total_skipped += batch_skipped
                 
-                print(f"   ✅ Batch {i//batch_size + 1}: {batch_inserted} posts inserted")
+                print(f"   ✅ Batch {i//batch_size + 1}: {batch_inserted} posts inserted, {batch_skipped} already existed")
                 
             except Exception as e:
                 total_errors += len(batch)
@@ -129,6 +200,7 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
         
         return {
             'inserted_count': total_inserted,
+            'skipped_count': total_skipped,
             'error_count': total_errors,
             'total_processed': len(filtered_df)
         }
@@ -141,6 +213,28 @@ def save_posts_basic_schema(posts_df: pd.DataFrame) -> Dict[str, Any]:
             'error_message': str(e)
         }
 
+def compact_posts_frame(posts_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Narrow a posts frame to the stored columns with compact dtypes
+    
+    For frames kept in memory after extraction (e.g. for the daily filter):
+    computed fields are dropped, subreddit becomes categorical and counts
+    are downcast. save_posts_basic_schema accepts the result unchanged.
+    """
+    
+    compact_df = posts_df[[col for col in _DATABASE_COLUMNS if col in posts_df.columns]]
+    
+    if 'subreddit' in compact_df.columns:
+        compact_df = compact_df.assign(subreddit=compact_df['subreddit'].astype('category'))
+    for col in ('score', 'num_comments', 'category_id'):
+        if col in compact_df.columns and pd.api.types.is_numeric_dtype(compact_df[col]) and compact_df[col].notna().all():
+            compact_df = compact_df.assign(**{col: pd.to_numeric(compact_df[col], downcast='integer')})
+    
+    return compact_df
+
 def get_fixed_db_service():
-    """Get database service with fixed schema handling"""
-    return get_enhanced_db_service()
\ No newline at end of file
+    """Get global database service instance with fixed schema handling"""
+    global _db_service
+    if _db_service is None:
+        _db_service = get_enhanced_db_service()
+    return _db_service
\ No newline at end of file
@@ -9,11 +9,21 @@ import os
 import sys
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, List, Tuple
+from typing import Dict, Optional, Tuple
 from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import json
 import time
+import threading
+
+# orjson serializes SSE events faster when installed; stdlib json otherwise
+try:
+    import orjson
+    def _dumps(payload) -> str:
+        return orjson.dumps(payload).decode()
+except ImportError:
+    def _dumps(payload) -> str:
+        return json.dumps(payload)
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,22 +33,83 @@ from extractors.entertainment_database_extractor import EntertainmentDatabaseExt
 from extractors.travel_database_extractor import TravelDatabaseExtractor
 from services.enhanced_database_service import get_enhanced_db_service
 
+# Global extractor instances shared by every updater (and every API request);
+# each extractor holds a Reddit client plus NER/sentiment models that are
+# expensive to load
+_extractors = None
+_extractors_lock = threading.Lock()
+
+# PRAW clients are not thread-safe, so calls into one domain's extractor are
+# serialized (different domains still extract in parallel)
+_extractor_call_locks = {
+    'finance': threading.Lock(),
+    'entertainment': threading.Lock(),
+    'travel': threading.Lock()
+}
+
+def get_extractors() -> Dict[str, object]:
+    """Get global domain extractor instances"""
+    global _extractors
+    if _extractors is None:
+        with _extractors_lock:
+            if _extractors is None:
+                _extractors = {
+                    'finance': FinanceDatabaseExtractor(),
+                    'entertainment': EntertainmentDatabaseExtractor(),
+                    'travel': TravelDatabaseExtractor()
+                }
+    return _extractors
+
+# Latest post time per (domain, time_filter), reused across dashboard polls
+_LATEST_POST_TTL = 60  # seconds
+_latest_post_cache = {}
+_latest_post_lock = threading.Lock()
+
+# Skip the Reddit fetch entirely when the newest stored post is this recent
+_FRESH_SKIP_MINUTES = int(os.getenv('INCREMENTAL_FRESH_MINUTES', '10'))
+
+# Process-wide cap on in-flight Supabase requests, shared by every updater
+# (parallel domains and concurrent API requests would otherwise pile up)
+_SUPABASE_MAX_CONCURRENCY = int(os.getenv('SUPABASE_MAX_CONCURRENCY', '8'))
+_supabase_semaphore = threading.BoundedSemaphore(_SUPABASE_MAX_CONCURRENCY)
+
+def _normalize_created_utc(posts_df: pd.DataFrame) -> pd.DataFrame:
+    """Parse created_utc once for the whole column (naive UTC datetimes)"""
+    if 'created_utc' in posts_df.columns:
+        posts_df['created_utc'] = pd.to_datetime(
+            posts_df['created_utc'], utc=True, format='ISO8601'
+        ).dt.tz_convert(None)
+    return posts_df
+
+def _rpc_count(data, key: str) -> int:
+    """
+    Read an integer result from an RPC response
+    
+    Depending on the client version a scalar function comes back bare, as a
+    row ({function_name: value}) or as a list of such rows
+    """
+    if isinstance(data, list):
+        data = data[0] if data else 0
+    if isinstance(data, dict):
+        data = data.get(key)
+    return int(data or 0)
+
 class IncrementalDatabaseUpdate:
     """
     Incremental update service that only processes new/expired posts
     Much faster than full regeneration
     """
     
-    def __init__(self, time_filter='week'):
+    def __init__(self, time_filter='week', max_workers: int = None):
         self.time_filter = time_filter  # 'week' or 'day'
+        self.max_workers = max_workers or 3  # one worker per domain
         self.db_service = get_enhanced_db_service()
         
-        # Initialize extractors
-        self.extractors = {
-            'finance': FinanceDatabaseExtractor(),
-            'entertainment': EntertainmentDatabaseExtractor(), 
-            'travel': TravelDatabaseExtractor()
-        }
+        # Reuse process-wide extractors (and their clients/models)
+        self.extractors = get_extractors()
+        
+        # Subreddit lists per domain, resolved once instead of on every query
+        self._subs = {domain: list(extractor.subreddits) for domain, extractor in self.extractors.items()}
         
         print(f"🔄 Incremental Database Update ({time_filter})")
         print("=" * 50)
@@ -51,19 +122,43 @@ class IncrementalDatabaseUpdate:
         else:  # day
             return now - timedelta(days=1)
     
+    def _get_cached_latest_post_time(self, domain: str) -> Optional[datetime]:
+        """Get cached latest post time if it is younger than the TTL"""
+        with _latest_post_lock:
+            cached = _latest_post_cache.get((domain, self.time_filter))
+        if cached and time.monotonic() - cached[0] < _LATEST_POST_TTL:
+            return cached[1]
+        return None
+    
+    def _cache_latest_post_time(self, domain: str, latest_post_time: datetime):
+        """Store latest post time for a domain"""
+        with _latest_post_lock:
+            _latest_post_cache[(domain, self.time_filter)] = (time.monotonic(), latest_post_time)
+    
+    def _invalidate_latest_post_time(self, domain: str):
+        """Drop cached latest post time so the next update re-reads it"""
+        with _latest_post_lock:
+            _latest_post_cache.pop((domain, self.time_filter), None)
+    
     def get_latest_post_time(self, domain: str) -> datetime:
         """Get timestamp of most recent post for a domain"""
+        cached = self._get_cached_latest_post_time(domain)
+        if cached is not None:
+            return cached
+        
         try:
             # Get domain-specific subreddits
-            extractor = self.extractors[domain]
-            subreddits = extractor.subreddits
+            subreddits = self._subs[domain]
             
             # Query for most recent post from this domain
-            result = self.db_service.supabase.table('posts').select('created_utc').in_('subreddit', subreddits).eq('time_filter', self.time_filter).order('created_utc', desc=True).limit(1).execute()
+            with _supabase_semaphore:
+                result = self.db_service.supabase.table('posts').select('created_utc').in_('subreddit', subreddits).eq('time_filter', self.time_filter).order('created_utc', desc=True).limit(1).execute()
             
             if result.data:
                 latest_str = result.data[0]['created_utc']
-                return datetime.fromisoformat(latest_str.replace('Z', '+00:00')).replace(tzinfo=None)
+                latest_post_time = datetime.fromisoformat(latest_str.replace('Z', '+00:00')).replace(tzinfo=None)
+                self._cache_latest_post_time(domain, latest_post_time)
+                return latest_post_time
             else:
                 # No posts found, return old date to trigger full extraction
                 return datetime.utcnow() - timedelta(days=30)
@@ -74,8 +169,7 @@ class IncrementalDatabaseUpdate:
     
     def _get_subreddit_list(self, domain: str) -> str:
         """Get formatted subreddit list for SQL query"""
-        extractor = self.extractors[domain]
-        subreddits = [f"'{sub}'" for sub in extractor.subreddits]
+        subreddits = [f"'{sub}'" for sub in self._subs[domain]]
         return ','.join(subreddits)
     
     def remove_expired_posts(self, domain: str) -> int:
@@ -84,13 +178,23 @@ class IncrementalDatabaseUpdate:
         
         try:
             # Get domain-specific subreddits
-            extractor = self.extractors[domain]
-            subreddits = extractor.subreddits
+            subreddits = self._subs[domain]
             
-            # Delete expired posts for this domain
-            result = self.db_service.supabase.table('posts').delete().lt('created_utc', cutoff_time.isoformat()).in_('subreddit', subreddits).eq('time_filter', self.time_filter).execute()
+            try:
+                # Delete server-side and return only the count (see database/schema.sql)
+                with _supabase_semaphore:
+                    result = self.db_service.supabase.rpc('expire_posts', {
+                        'subreddit_names': subreddits,
+                        'time_filter_param': self.time_filter,
+                        'cutoff': cutoff_time.isoformat()
+                    }).execute()
+                deleted_count = _rpc_count(result.data, 'expire_posts')
+            except Exception:
+                # Function not deployed - delete via PostgREST, count only (no rows in the body)
+                with _supabase_semaphore:
+                    result = self.db_service.supabase.table('posts').delete(count='exact', returning='minimal').lt('created_utc', cutoff_time.isoformat()).in_('subreddit', subreddits).eq('time_filter', self.time_filter).execute()
+                deleted_count = result.count or 0
             
-            deleted_count = len(result.data) if result.data else 0
             print(f"  🗑️  Removed {deleted_count} expired {domain} posts")
             return deleted_count
             
@@ -98,11 +202,61 @@ class IncrementalDatabaseUpdate:
             print(f"  ❌ Error removing expired {domain} posts: {e}")
             return 0
     
-    def extract_new_posts(self, domain: str) -> Tuple[int, int]:
+    def _prep_domain(self, domain: str) -> Tuple[int, datetime]:
+        """
+        Remove expired posts and get the latest post time in one database call
+        
+        Uses the incremental_prep RPC (see database/schema.sql); falls back to
+        separate DELETE and SELECT queries if the function is not deployed yet.
+        
+        Returns:
+            Tuple of (removed_count, latest_post_time)
+        """
+        # Prepared within the last minute - expired posts were just removed
+        cached = self._get_cached_latest_post_time(domain)
+        if cached is not None:
+            print(f"  ⚡ {domain.capitalize()} prepared recently, skipping expiry check")
+            return 0, cached
+        
+        cutoff_time = self.get_time_cutoff()
+        
+        try:
+            with _supabase_semaphore:
+                result = self.db_service.supabase.rpc('incremental_prep', {
+                    'subreddit_names': self._subs[domain],
+                    'time_filter_param': self.time_filter,
+                    'cutoff': cutoff_time.isoformat()
+                }).execute()
+            
+            row = result.data[0] if result.data else {}
+            deleted_count = int(row.get('deleted_count') or 0)
+            latest_str = row.get('latest_created_utc')
+            
+            if latest_str:
+                latest_post_time = datetime.fromisoformat(latest_str.replace('Z', '+00:00')).replace(tzinfo=None)
+            else:
+                # No posts found, return old date to trigger full extraction
+                latest_post_time = datetime.utcnow() - timedelta(days=30)
+            
+            self._cache_latest_post_time(domain, latest_post_time)
+            print(f"  🗑️  Removed {deleted_count} expired {domain} posts")
+            return deleted_count, latest_post_time
+            
+        except Exception as e:
+            print(f"  ⚠️  incremental_prep RPC unavailable for {domain} ({e}), using separate queries")
+            return self.remove_expired_posts(domain), self.get_latest_post_time(domain)
+    
+    def extract_new_posts(self, domain: str, latest_post_time: datetime = None) -> Tuple[int, int]:
         """Extract only new posts since last update"""
-        latest_post_time = self.get_latest_post_time(domain)
+        if latest_post_time is None:
+            latest_post_time = self.get_latest_post_time(domain)
         cutoff_time = self.get_time_cutoff()
         
+        # Newest post is only minutes old - nothing worth a Reddit round trip
+        if latest_post_time > datetime.utcnow() - timedelta(minutes=_FRESH_SKIP_MINUTES):
+            print(f"  ✅ {domain.capitalize()} data is fresh (<{_FRESH_SKIP_MINUTES}m), skipping Reddit fetch")
+            return 0, 0
+        
         # Only extract if we haven't updated recently (within last hour)
         if latest_post_time > datetime.utcnow() - timedelta(hours=1):
             print(f"  ✅ {domain.capitalize()} data is recent, checking for new posts...")
@@ -115,50 +269,34 @@ class IncrementalDatabaseUpdate:
         
         try:
             # Get new posts with custom since time
-            new_posts_df = extractor.extract_posts_since(fetch_since, self.time_filter)
+            with _extractor_call_locks[domain]:
+                new_posts_df = extractor.extract_posts_since(fetch_since, self.time_filter)
             
             if new_posts_df.empty:
                 print(f"  ✅ No new {domain} posts to add")
                 return 0, 0
             
-            # Remove duplicates (posts that might already exist)
-            existing_ids = self._get_existing_post_ids(domain, new_posts_df['id'].tolist())
-            new_posts_df = new_posts_df[~new_posts_df['id'].isin(existing_ids)]
+            new_posts_df = _normalize_created_utc(new_posts_df)
             
-            if new_posts_df.empty:
-                print(f"  ✅ All {domain} posts already exist")
-                return 0, 0
-            
-            # Insert new posts using enhanced database service
+            # Insert new posts; existing IDs are skipped by the database (ON CONFLICT DO NOTHING)
             from services.enhanced_database_service import save_posts_with_computed_fields
-            result = save_posts_with_computed_fields(new_posts_df)
+            with _supabase_semaphore:
+                result = save_posts_with_computed_fields(new_posts_df, ignore_duplicates=True)
             
             added_count = result.get('inserted_count', 0)
+            skipped_count = result.get('skipped_count', 0)
             total_new = len(new_posts_df)
             
-            print(f"  ➕ Added {added_count} new {domain} posts")
+            if added_count == 0:
+                print(f"  ✅ All {domain} posts already exist")
+            else:
+                print(f"  ➕ Added {added_count} new {domain} posts ({skipped_count} already existed)")
             return added_count, total_new
             
         except Exception as e:
             print(f"  ❌ Error extracting new {domain} posts: {e}")
             return 0, 0
     
-    def _get_existing_post_ids(self, domain: str, post_ids: List[str]) -> List[str]:
-        """Get list of post IDs that already exist in database"""
-        try:
-            if not post_ids:
-                return []
-            
-            # Query for existing IDs
-            result = self.db_service.supabase.table('posts').select('id').in_('id', post_ids).eq('time_filter', self.time_filter).execute()
-            
-            existing_ids = [row['id'] for row in result.data] if result.data else []
-            return existing_ids
-            
-        except Exception as e:
-            print(f"  ⚠️  Error checking existing post IDs: {e}")
-            return []
-    
     def update_domain(self, domain: str) -> Dict[str, int]:
         """Update a specific domain incrementally"""
         print(f"\\n🔄 Updating {domain.capitalize()} ({self.time_filter})")
@@ -166,11 +304,15 @@ class IncrementalDatabaseUpdate:
         
         start_time = datetime.now()
         
-        # Step 1: Remove expired posts
-        removed_count = self.remove_expired_posts(domain)
+        # Step 1: Remove expired posts (and read latest post time in the same call)
+        removed_count, latest_post_time = self._prep_domain(domain)
         
         # Step 2: Add new posts
-        added_count, total_new = self.extract_new_posts(domain)
+        added_count, total_new = self.extract_new_posts(domain, latest_post_time)
+        
+        # New posts change the latest post time
+        if added_count:
+            self._invalidate_latest_post_time(domain)
         
         duration = datetime.now() - start_time
         
@@ -195,7 +337,7 @@ class IncrementalDatabaseUpdate:
         
         if parallel:
             # Run domains in parallel
-            with ThreadPoolExecutor(max_workers=3) as executor:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 future_to_domain = {
                     executor.submit(self.update_domain, domain): domain 
                     for domain in domains
@@ -272,7 +414,7 @@ class IncrementalDatabaseUpdate:
         
         if parallel:
             # Run domains in parallel for maximum speed
-            with ThreadPoolExecutor(max_workers=3) as executor:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
                 future_to_domain = {
                     executor.submit(self.fast_update_domain, domain): domain 
                     for domain in domains
@@ -346,38 +488,42 @@ class IncrementalDatabaseUpdate:
         start_time = datetime.now()
         
         # Step 1: Remove expired posts (quick)
-        removed_count = self.remove_expired_posts(domain)
+        removed_count, _ = self._prep_domain(domain)
         
         # Step 2: Fast extraction from key subreddits
         extractor = self.extractors[domain]
         
         try:
             # Use the new fast update method
-            new_posts_df = extractor.extract_fast_update(self.time_filter)
+            with _extractor_call_locks[domain]:
+                new_posts_df = extractor.extract_fast_update(self.time_filter)
             
             if new_posts_df.empty:
                 print(f"  ✅ No new {domain} posts to add")
                 added_count = 0
             else:
-                # Remove duplicates (posts that might already exist)
-                existing_ids = self._get_existing_post_ids(domain, new_posts_df['id'].tolist())
-                new_posts_df = new_posts_df[~new_posts_df['id'].isin(existing_ids)]
+                new_posts_df = _normalize_created_utc(new_posts_df)
+                
+                # Insert new posts; existing IDs are skipped by the database (ON CONFLICT DO NOTHING)
+                from services.enhanced_database_service import save_posts_with_computed_fields
+                with _supabase_semaphore:
+                    result = save_posts_with_computed_fields(new_posts_df, ignore_duplicates=True)
                 
-                if new_posts_df.empty:
+                added_count = result.get('inserted_count', 0)
+                skipped_count = result.get('skipped_count', 0)
+                if added_count == 0:
                     print(f"  ✅ All {domain} posts already exist")
-                    added_count = 0
                 else:
-                    # Insert new posts using enhanced database service
-                    from services.enhanced_database_service import save_posts_with_computed_fields
-                    result = save_posts_with_computed_fields(new_posts_df)
-                    
-                    added_count = result.get('inserted_count', 0)
-                    print(f"  ➕ Added {added_count} new {domain} posts")
+                    print(f"  ➕ Added {added_count} new {domain} posts ({skipped_count} already existed)")
                     
         except Exception as e:
             print(f"  ❌ Error extracting new {domain} posts: {e}")
             added_count = 0
         
+        # New posts change the latest post time
+        if added_count:
+            self._invalidate_latest_post_time(domain)
+        
         duration = datetime.now() - start_time
         
         result = {
@@ -435,7 +581,7 @@ def update_feed_stream():
             data = request.get_json() if request.get_json() else {}
             time_filter = data.get('time_filter', 'week')
             
-            yield f"data: {json.dumps({'status': 'starting', 'message': f'Starting incremental {time_filter} update...'})}\n\n"
+            yield f"data: {_dumps({'status': 'starting', 'message': f'Starting incremental {time_filter} update...'})}\n\n"
             
             # Create updater
             updater = IncrementalDatabaseUpdate(time_filter)
@@ -444,22 +590,28 @@ def update_feed_stream():
             domains = ['finance', 'entertainment', 'travel']
             results = []
             
-            for i, domain in enumerate(domains, 1):
-                yield f"data: {json.dumps({'status': 'updating', 'domain': domain, 'progress': i, 'total': len(domains)})}\n\n"
+            # Run domains in parallel and report each one as it finishes
+            with ThreadPoolExecutor(max_workers=updater.max_workers) as executor:
+                future_to_domain = {}
+                for i, domain in enumerate(domains, 1):
+                    yield f"data: {_dumps({'status': 'updating', 'domain': domain, 'progress': i, 'total': len(domains)})}\n\n"
+                    future_to_domain[executor.submit(updater.update_domain, domain)] = domain
                 
-                result = updater.update_domain(domain)
-                results.append(result)
-                
-                yield f"data: {json.dumps({'status': 'completed_domain', 'domain': domain, 'added': result['added'], 'removed': result['removed']})}\n\n"
+                for future in as_completed(future_to_domain):
+                    domain = future_to_domain[future]
+                    result = future.result()
+                    results.append(result)
+                    
+                    yield f"data: {_dumps({'status': 'completed_domain', 'domain': domain, 'added': result['added'], 'removed': result['removed']})}\n\n"
             
             # Final summary
             total_added = sum(r['added'] for r in results)
             total_removed = sum(r['removed'] for r in results)
             
-            yield f"data: {json.dumps({'status': 'complete', 'total_added': total_added, 'total_removed': total_removed, 'success': True})}\n\n"
+            yield f"data: {_dumps({'status': 'complete', 'total_added': total_added, 'total_removed': total_removed, 'success': True})}\n\n"
             
         except Exception as e:
-            yield f"data: {json.dumps({'status': 'error', 'message': str(e), 'success': False})}\n\n"
+            yield f"data: {_dumps({'status': 'error', 'message': str(e), 'success': False})}\n\n"
     
     return Response(generate(), mimetype='text/event-stream',
                    headers={'Cache-Control': 'no-cache', 'Connection': 'keep-alive'})
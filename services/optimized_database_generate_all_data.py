@@ -4,28 +4,16 @@ Optimized Database-First Generate All Data Script
 50%+ faster than original - eliminates duplicate API calls and artificial delays
 """
 
-import subprocess
 import sys
-import time
 import pandas as pd
 import os
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def run_command(command, description):
-    """Run a command and handle errors"""
-    print(f"\n🚀 {description}")
-    print("=" * 60)
-    
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=False)
-        print(f"✅ {description} completed successfully")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed with error code: {e.returncode}")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error during {description}: {e}")
-        return False
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services._pipeline_runner import run_command, start_service
 
 def main():
     """Generate all data using optimized database-first approach"""
@@ -42,7 +30,7 @@ def main():
     
     # Check for force refresh flag
     force_refresh = '--force' in sys.argv or '-f' in sys.argv
-    force_flag = ' --force' if force_refresh else ''
+    force_args = ['--force'] if force_refresh else []
     
     if force_refresh:
         print("🔄 Force refresh mode enabled - ignoring smart cache")
@@ -50,72 +38,45 @@ def main():
     # Step 1: Run Optimized Database Pipeline (SINGLE EXTRACTION)
     print(f"\n📋 Step 1/4: Optimized Single-Pass Extraction")
     print("⚡ Fetches weekly data once, filters for daily (eliminates ~99 API calls)")
-    if run_command(f"python services/optimized_database_pipeline.py{force_flag}", "Optimized Single-Pass Extraction"):
+    if run_command(["python", "services/optimized_database_pipeline.py"] + force_args, "Optimized Single-Pass Extraction"):
         success_count += 1
     else:
         print("⚠️  Optimized extraction failed - falling back to original method...")
         
         # Fallback to original method if optimized fails
         print(f"\n📋 Fallback: Weekly Database Extraction")
-        if run_command("python services/database_unified_pipeline.py week", "Weekly Database Extraction"):
+        if run_command(["python", "services/database_unified_pipeline.py", "week"], "Weekly Database Extraction"):
             success_count += 1
         
         # No artificial 60-second delay in optimized version
         print("\n📋 Fallback: Daily Database Extraction")
-        if run_command("python services/database_unified_pipeline.py day", "Daily Database Extraction"):
+        if run_command(["python", "services/database_unified_pipeline.py", "day"], "Daily Database Extraction"):
             pass  # Don't increment success_count to maintain step count
     
-    # Step 2: Generate Pure Database Dashboard
-    print(f"\n📋 Step 2/4: Pure Database Dashboard Generation")
-    if run_command("python utils/original_style_database_dashboard.py", "Pure Database Dashboard Generation"):
-        success_count += 1
-    
-    # Step 3: Start Comment API Service (background)
-    print("\n📋 Step 3/4: Starting Comment API Service")
-    print("=" * 60)
-    try:
-        comment_process = subprocess.Popen(
-            [sys.executable, "utils/live_comment_fetcher.py"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        time.sleep(2)  # Give it time to start
-        if comment_process.poll() is None:  # Still running
-            print("✅ Comment API Service started on http://localhost:5001")
-            success_count += 1
-        else:
-            print("❌ Comment API Service failed to start")
-    except Exception as e:
-        print(f"❌ Error starting Comment API: {e}")
-    
-    # Step 4: Start AI Summarizer Service (background)
-    print("\n📋 Step 4/4: Starting AI Summarizer Service")
-    print("=" * 60)
+    # Steps 2-4 only depend on step 1 - run them concurrently
+    print(f"\n📋 Steps 2-4/4: Dashboard Generation + Comment API + AI Summarizer (parallel)")
     
     # Check if GROQ_API_KEY is set
-    if not os.getenv('GROQ_API_KEY'):
+    start_summarizer = bool(os.getenv('GROQ_API_KEY'))
+    if not start_summarizer:
         print("❌ GROQ_API_KEY environment variable not set")
         print("   Please set it before running: export GROQ_API_KEY='your-key-here'")
         print("   AI Summarizer will not work without this key")
-    else:
-        try:
-            ai_process = subprocess.Popen(
-                [sys.executable, "services/ai_summarizer.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            time.sleep(3)  # Give it more time to start
-            if ai_process.poll() is None:  # Still running
-                print("✅ AI Summarizer Service started on http://localhost:5002")
+    
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # Step 2: Generate Pure Database Dashboard
+        futures = [executor.submit(run_command, ["python", "utils/original_style_database_dashboard.py"], "Pure Database Dashboard Generation")]
+        
+        # Step 3: Start Comment API Service (background)
+        futures.append(executor.submit(start_service, ["python", "utils/live_comment_fetcher.py"], 5001, "Comment API Service"))
+        
+        # Step 4: Start AI Summarizer Service (background)
+        if start_summarizer:
+            futures.append(executor.submit(start_service, ["python", "services/ai_summarizer.py"], 5002, "AI Summarizer Service"))
+        
+        for future in as_completed(futures):
+            if future.result():
                 success_count += 1
-            else:
-                # Get error output
-                stdout, stderr = ai_process.communicate()
-                print("❌ AI Summarizer Service failed to start")
-                if stderr:
-                    print(f"   Error: {stderr.decode()}")
-        except Exception as e:
-            print(f"❌ Error starting AI Summarizer: {e}")
     
     # Summary
     end_time = datetime.now()
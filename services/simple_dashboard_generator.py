@@ -6,6 +6,8 @@ Bypasses template issues and generates fresh HTML with current data
 
 import sys
 import os
+import re
+import html
 from datetime import datetime
 import json
 
@@ -14,6 +16,63 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.enhanced_database_service import get_enhanced_db_service
 
+# Fields shown per post, with the value used when a post lacks one
+_POST_DEFAULTS = {
+    'title': 'No Title',
+    'author': 'Unknown',
+    'subreddit': 'Unknown',
+    'score': 0,
+    'num_comments': 0,
+    'url': '#'
+}
+
+# Reddit-supplied text is escaped before it is placed in the page
+_ESCAPED_FIELDS = ('title', 'author', 'subreddit')
+
+# Whitespace between tags - collapsed to one space so inline elements stay apart
+_WS_RE = re.compile(r'>\s+<')
+
+# HTML fragments filled per domain / per post
+_DOMAIN_HEADER = """
+    <div class="domain-section">
+        <div class="domain-header {domain_class}">
+            {domain_title} - Recent Posts ({post_count} total)
+        </div>
+        <div class="posts-grid">
+"""
+
+_POST_ROW = """
+            <div class="post-item">
+                <div class="post-title">
+                    <a href="{url}" target="_blank" style="text-decoration: none; color: #1a73e8;">{title}</a>
+                </div>
+                <div class="post-meta">
+                    r/{subreddit} • by u/{author} • {score} points • {num_comments} comments
+                </div>
+            </div>
+"""
+
+def _top_post_records(posts_df, limit):
+    """Prepare the first `limit` posts for display as plain dicts (column-wise)"""
+    if posts_df.empty:
+        return []
+    
+    top_posts = posts_df.head(limit).reindex(columns=list(_POST_DEFAULTS)).fillna(_POST_DEFAULTS)
+    
+    titles = top_posts['title'].astype(str)
+    short_titles = titles.str.slice(0, 100)
+    top_posts['title'] = short_titles.where(titles.str.len() <= 100, short_titles + '...')
+    for col in _ESCAPED_FIELDS:
+        top_posts[col] = top_posts[col].astype(str).map(html.escape)
+    
+    # Only link out to http(s) URLs; anything else (javascript:, data:) becomes '#'
+    urls = top_posts['url'].astype(str)
+    top_posts['url'] = urls.where(urls.str.match(r'https?://'), '#').map(html.escape)
+    top_posts['score'] = top_posts['score'].astype(int)
+    top_posts['num_comments'] = top_posts['num_comments'].astype(int)
+    
+    return top_posts.to_dict('records')
+
 def generate_simple_dashboard():
     """Generate a simple but functional dashboard from database data"""
     
@@ -30,9 +89,12 @@ def generate_simple_dashboard():
     data = {}
     total_posts = 0
     
+    # One batched query for all domains and both time filters
+    posts = db.get_posts_by_domains(domains, ['week', 'day'])
+    
     for domain in domains:
-        weekly_posts = db.get_posts_by_domain(domain, 'week')
-        daily_posts = db.get_posts_by_domain(domain, 'day')
+        weekly_posts = posts[(domain, 'week')]
+        daily_posts = posts[(domain, 'day')]
         
         data[domain] = {
             'weekly': weekly_posts,
@@ -49,7 +111,7 @@ def generate_simple_dashboard():
     # Generate HTML
     print("🎨 Generating HTML...")
     
-    html_content = f"""<!DOCTYPE html>
+    parts = [f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -146,57 +208,39 @@ def generate_simple_dashboard():
             <p><strong>Daily:</strong> {data['travel']['daily_count']} posts</p>
         </div>
     </div>
-"""
+"""]
     
     # Add domain sections
     for domain in domains:
         weekly_posts = data[domain]['weekly']
         domain_class = domain
         
-        html_content += f"""
-    <div class="domain-section">
-        <div class="domain-header {domain_class}">
-            {domain.title()} - Recent Posts ({len(weekly_posts)} total)
-        </div>
-        <div class="posts-grid">
-"""
+        parts.append(_DOMAIN_HEADER.format(
+            domain_class=domain_class,
+            domain_title=domain.title(),
+            post_count=len(weekly_posts)
+        ))
         
         # Show top 20 posts for each domain
-        top_posts = weekly_posts.head(20) if not weekly_posts.empty else []
+        parts.extend(_POST_ROW.format_map(post) for post in _top_post_records(weekly_posts, 20))
         
-        for _, post in top_posts.iterrows():
-            title = str(post.get('title', 'No Title'))[:100] + ('...' if len(str(post.get('title', ''))) > 100 else '')
-            author = str(post.get('author', 'Unknown'))
-            subreddit = str(post.get('subreddit', 'Unknown'))
-            score = int(post.get('score', 0))
-            comments = int(post.get('num_comments', 0))
-            url = str(post.get('url', '#'))
-            
-            html_content += f"""
-            <div class="post-item">
-                <div class="post-title">
-                    <a href="{url}" target="_blank" style="text-decoration: none; color: #1a73e8;">{title}</a>
-                </div>
-                <div class="post-meta">
-                    r/{subreddit} • by u/{author} • {score} points • {comments} comments
-                </div>
-            </div>
-"""
-        
-        html_content += """
+        parts.append("""
         </div>
     </div>
-"""
+""")
     
     # Close HTML
-    html_content += """
+    parts.append("""
     <div class="header">
         <p><strong>✅ Dashboard successfully generated from live database!</strong></p>
         <p>This dashboard shows current data from your Supabase database, proving the extraction pipeline is working correctly.</p>
     </div>
 </body>
 </html>
-"""
+""")
+    
+    # Join once at the end - repeated += would copy the whole page each time
+    html_content = _WS_RE.sub('> <', ''.join(parts))
     
     # Save dashboard
     output_path = 'assets/reddit_dashboard.html'
@@ -0,0 +1,73 @@
+"""
+Tests for posts frames read from the database, as the dashboards consume them
+"""
+
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('supabase')
+
+from services.database_service import _posts_frame
+
+
+def _link_post_frame():
+    """A stored link post - no selftext, author or flair"""
+    posts_df = _posts_frame([{
+        'id': 'abc123',
+        'post_id': 'abc123',
+        'subreddit': 'investing',
+        'title': 'A link post',
+        'author': None,
+        'score': 10,
+        'num_comments': 2,
+        'created_utc': '2025-08-01T12:00:00',
+        'url': 'https://example.com/article',
+        'selftext': None,
+        'link_flair_text': None,
+        'popularity_score': 1.5,
+        'time_filter': 'week'
+    }])
+    posts_df['created_utc'] = pd.to_datetime(posts_df['created_utc'])
+    return posts_df
+
+
+def test_missing_text_is_read_as_empty_string():
+    post = _link_post_frame().iloc[0]
+
+    assert post['selftext'] == ''
+    assert post['author'] == ''
+    assert post['link_flair_text'] == ''
+
+
+def test_post_card_renders_link_post_without_selftext():
+    pytest.importorskip('vaderSentiment')
+    pytest.importorskip('transformers')
+    from utils.dashboard_generator_backup import CleanRedditDashboard
+
+    dashboard = CleanRedditDashboard.__new__(CleanRedditDashboard)
+    post = _link_post_frame().iloc[0]
+
+    card = dashboard._generate_post_card(post, 'General')
+
+    assert 'data-search-content=""' in card
+    assert '<NA>' not in card
+
+
+def test_javascript_data_has_no_na_markers():
+    from utils.original_style_database_dashboard import OriginalStyleDatabaseDashboard
+
+    dashboard = OriginalStyleDatabaseDashboard.__new__(OriginalStyleDatabaseDashboard)
+    dashboard.datasets = {'finance_weekly': _link_post_frame()}
+
+    js_data = dashboard._generate_javascript_data()
+
+    posts = json.loads(js_data.split('const finance_weekly_posts = ', 1)[1].split(';\n', 1)[0])
+    assert posts[0]['author'] == ''
+    assert '<NA>' not in js_data
@@ -0,0 +1,68 @@
+"""
+Tests for record building in insert_posts_with_computed_fields (no live
+database - the write client is replaced with a recorder)
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('supabase')
+
+from services.enhanced_database_service import EnhancedDatabaseService
+
+
+class _RecordingClient:
+    """Stands in for write_client, storing every record sent to posts"""
+
+    def __init__(self):
+        self.sent = []
+        self.records = None
+
+    def table(self, name):
+        return self
+
+    def upsert(self, records, **kwargs):
+        self.records = records
+        return self
+
+    def execute(self):
+        self.sent.extend(self.records)
+        return type('Result', (), {'count': len(self.records)})()
+
+
+def _service():
+    service = EnhancedDatabaseService.__new__(EnhancedDatabaseService)
+    service.write_client = _RecordingClient()
+    service.computed_fields_supported = True
+    return service
+
+
+def test_naive_created_utc_keeps_microseconds():
+    service = _service()
+    posts_df = pd.DataFrame({
+        'id': ['abc123', 'def456'],
+        'created_utc': [pd.Timestamp('2025-08-01 12:00:00.123456'), pd.NaT]
+    })
+
+    service.insert_posts_with_computed_fields(posts_df)
+
+    created = {record['id']: record['created_utc'] for record in service.write_client.sent}
+    assert created == {'abc123': '2025-08-01T12:00:00.123456', 'def456': None}
+
+
+def test_tz_aware_created_utc_is_stored_as_utc():
+    service = _service()
+    posts_df = pd.DataFrame({
+        'id': ['abc123'],
+        'created_utc': [pd.Timestamp('2025-08-01 14:00:00.5', tz='Europe/Berlin')]
+    })
+
+    service.insert_posts_with_computed_fields(posts_df)
+
+    assert service.write_client.sent[0]['created_utc'] == '2025-08-01T12:00:00.500000+00:00'
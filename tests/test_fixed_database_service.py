@@ -0,0 +1,94 @@
+"""
+Tests for the basic-schema post writer (no live database - the Supabase
+service is replaced with a recorder)
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('supabase')
+
+from services import fixed_database_service
+
+
+class _RecordingTable:
+    """Stands in for supabase_service.table('posts'), storing every batch sent
+    and counting only ids that are not stored yet (ignore_duplicates)"""
+
+    def __init__(self, sent, stored_ids):
+        self.sent = sent
+        self.stored_ids = stored_ids
+        self.records = None
+
+    def upsert(self, records, **kwargs):
+        self.records = records
+        return self
+
+    def execute(self):
+        self.sent.extend(self.records)
+        new_ids = {record['id'] for record in self.records} - self.stored_ids
+        self.stored_ids.update(new_ids)
+        return type('Result', (), {'count': len(new_ids)})()
+
+
+class _RecordingService:
+    def __init__(self, stored_ids=()):
+        self.sent = []
+        self.stored_ids = set(stored_ids)
+        self.supabase_service = self
+
+    def table(self, name):
+        return _RecordingTable(self.sent, self.stored_ids)
+
+
+def _post(**overrides):
+    post = {
+        'id': 'abc123',
+        'subreddit': 'investing',
+        'title': 'A title',
+        'author': 'someone',
+        'score': 10,
+        'upvote_ratio': 0.9,
+        'num_comments': 2,
+        'created_utc': pd.Timestamp('2025-08-01 12:00:00'),
+        'url': 'https://reddit.com/r/investing/abc123',
+        'selftext': '',
+        'link_flair_text': 'Discussion',
+        'time_filter': 'week'
+    }
+    post.update(overrides)
+    return post
+
+
+def test_over_length_flair_is_truncated_to_column_size(monkeypatch):
+    service = _RecordingService()
+    monkeypatch.setattr(fixed_database_service, 'get_fixed_db_service', lambda: service)
+
+    posts_df = pd.DataFrame([_post(link_flair_text='F' * 250, author='a' * 80)])
+    result = fixed_database_service.save_posts_basic_schema(posts_df)
+
+    assert result['error_count'] == 0
+    assert result['inserted_count'] == 1
+    assert result['skipped_count'] == 0
+    stored = service.sent[0]
+    assert stored['link_flair_text'] == 'F' * 100
+    assert stored['author'] == 'a' * 50
+    assert stored['created_utc'] == '2025-08-01T12:00:00'
+
+
+def test_existing_posts_are_reported_as_skipped(monkeypatch):
+    service = _RecordingService(stored_ids={'abc123'})
+    monkeypatch.setattr(fixed_database_service, 'get_fixed_db_service', lambda: service)
+
+    posts_df = pd.DataFrame([_post(), _post(id='def456')])
+    result = fixed_database_service.save_posts_basic_schema(posts_df)
+
+    assert result['error_count'] == 0
+    assert result['inserted_count'] == 1
+    assert result['skipped_count'] == 1
@@ -0,0 +1,42 @@
+"""
+Tests for the per-domain Reddit circuit breakers
+"""
+
+import os
+import sys
+from collections import defaultdict
+
+import pytest
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+prawcore = pytest.importorskip('prawcore')
+
+from utils import reddit_circuit
+
+
+@pytest.fixture(autouse=True)
+def _fresh_breakers(monkeypatch):
+    monkeypatch.setattr(reddit_circuit, '_failure_times', defaultdict(list))
+    monkeypatch.setattr(reddit_circuit, '_open_until', {})
+
+
+def _api_error():
+    return prawcore.exceptions.PrawcoreException('server error')
+
+
+def test_failures_open_only_that_domains_circuit():
+    for _ in range(reddit_circuit._FAIL_MAX):
+        reddit_circuit.record_failure('finance', _api_error())
+
+    with pytest.raises(reddit_circuit.RedditCircuitOpen):
+        reddit_circuit.check('finance')
+    reddit_circuit.check('travel')
+
+
+def test_non_api_errors_are_not_counted():
+    for _ in range(reddit_circuit._FAIL_MAX):
+        reddit_circuit.record_failure('finance', ValueError('bad row'))
+
+    reddit_circuit.check('finance')
@@ -11,6 +11,13 @@ from utils.sentiment_analyzer import StockSentimentAnalyzer
 from utils.optimized_entertainment_sentiment_analyzer import OptimizedEntertainmentSentimentAnalyzer
 from utils.travel_city_tracker import TravelCityTracker
 
+# Multi-threaded CSV parsing when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    _CSV_ENGINE = 'pyarrow'
+except ImportError:
+    _CSV_ENGINE = 'c'
+
 # Database imports (database-first)
 try:
     from services.enhanced_database_service import get_enhanced_db_service
@@ -146,14 +153,33 @@ class CleanRedditDashboard:
                 # Load from CSV files
                 self._load_csv_data(category)
     
+    def _read_posts_file(self, csv_file):
+        """Read a posts CSV, preferring its Feather copy when that is up to date"""
+        feather_file = os.path.splitext(csv_file)[0] + '.feather'
+        if os.path.exists(feather_file) and os.path.getmtime(feather_file) >= os.path.getmtime(csv_file):
+            try:
+                # Dtypes (including created_utc datetimes) are stored, no re-parsing
+                return pd.read_feather(feather_file)
+            except Exception:
+                pass  # Unreadable copy or pyarrow missing - fall back to the CSV
+        
+        # Parse timestamps while reading instead of a separate to_datetime pass
+        df = pd.read_csv(csv_file, parse_dates=['created_utc'], engine=_CSV_ENGINE)
+        
+        # Migrate once so later loads skip CSV parsing entirely
+        try:
+            df.to_feather(feather_file)
+        except Exception:
+            pass
+        return df
+    
     def _load_csv_data(self, category):
         """Load data from CSV files (fallback method)"""
         # Try to load weekly data
         weekly_file = os.path.join(self.assets_directory, f'week_{category}_posts.csv')
         if os.path.exists(weekly_file):
             try:
-                df = pd.read_csv(weekly_file)
-                df['created_utc'] = pd.to_datetime(df['created_utc'])
+                df = self._read_posts_file(weekly_file)
                 self.datasets[category]['weekly'] = df
                 print(f"✅ Loaded weekly {category}: {len(df)} posts")
             except Exception as e:
@@ -163,8 +189,7 @@ class CleanRedditDashboard:
         daily_file = os.path.join(self.assets_directory, f'day_{category}_posts.csv')
         if os.path.exists(daily_file):
             try:
-                df = pd.read_csv(daily_file)
-                df['created_utc'] = pd.to_datetime(df['created_utc'])
+                df = self._read_posts_file(daily_file)
                 self.datasets[category]['daily'] = df
                 print(f"✅ Loaded daily {category}: {len(df)} posts")
             except Exception as e:
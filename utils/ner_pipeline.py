@@ -0,0 +1,52 @@
+"""
+Shared NER pipeline for the sentiment analyzers
+Loads dslim/bert-base-NER once per process instead of once per analyzer
+"""
+
+import threading
+from transformers import pipeline
+
+# Global pipeline instance shared by every analyzer (extractors, classifiers,
+# dashboards each create their own analyzer)
+_ner_pipeline = None
+_ner_loaded = False
+_ner_load_lock = threading.Lock()
+
+# Fast tokenizers are not safe to call from several threads at once
+# (domains are extracted in parallel), so calls are serialized
+_ner_call_lock = threading.Lock()
+
+def _load_ner_pipeline():
+    """Load the NER model, falling back to the transformers default"""
+    try:
+        print("Loading optimized NER pipeline (dslim/bert-base-NER)...")
+        ner = pipeline("ner",
+                       model="dslim/bert-base-NER",
+                       aggregation_strategy="simple")
+        print("✅ Optimized NER pipeline loaded successfully!")
+        return ner
+    except Exception as e:
+        print(f"⚠️  Could not load optimized NER pipeline: {e}")
+        print("Falling back to default model...")
+        try:
+            ner = pipeline("ner", aggregation_strategy="simple")
+            print("✅ Fallback NER pipeline loaded!")
+            return ner
+        except Exception as e2:
+            print(f"❌ Could not load any NER pipeline: {e2}")
+            return None
+
+def _run_ner(text):
+    """Run the shared pipeline on one text"""
+    with _ner_call_lock:
+        return _ner_pipeline(text)
+
+def get_ner_pipeline():
+    """Get the shared NER callable, or None if no model could be loaded"""
+    global _ner_pipeline, _ner_loaded
+    if not _ner_loaded:
+        with _ner_load_lock:
+            if not _ner_loaded:
+                _ner_pipeline = _load_ner_pipeline()
+                _ner_loaded = True
+    return _run_ner if _ner_pipeline is not None else None
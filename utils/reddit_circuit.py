@@ -0,0 +1,51 @@
+"""
+Per-domain circuit breakers for Reddit API calls
+Stops a domain's extractor from working through its remaining subreddits
+once Reddit is rate limiting or rejecting its requests; other domains keep
+their own state and carry on
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+
+import prawcore
+
+# Reddit errors within the window that open a domain's circuit, and how long it stays open
+_FAIL_MAX = int(os.getenv('REDDIT_CIRCUIT_FAIL_MAX', '3'))
+_WINDOW_SECONDS = 60
+_RESET_TIMEOUT = float(os.getenv('REDDIT_CIRCUIT_RESET_SECONDS', '60'))
+
+# Responses that will keep failing for every subreddit until the cause clears
+_TRIP_IMMEDIATELY = (prawcore.exceptions.TooManyRequests, prawcore.exceptions.OAuthException)
+
+# Breaker state keyed by domain ('finance', 'entertainment', 'travel')
+_lock = threading.Lock()
+_failure_times = defaultdict(list)
+_open_until = {}
+
+class RedditCircuitOpen(Exception):
+    """Raised instead of calling Reddit while a domain's circuit is open"""
+
+def check(domain: str):
+    """Raise RedditCircuitOpen if Reddit calls for a domain are currently suspended"""
+    remaining = _open_until.get(domain, 0.0) - time.monotonic()
+    if remaining > 0:
+        raise RedditCircuitOpen(f"Reddit API circuit for {domain} open for another {remaining:.0f}s after repeated API errors")
+
+def record_failure(domain: str, error: Exception):
+    """Count a failed Reddit call for a domain; non-API errors (parsing, classification) are ignored"""
+    if not isinstance(error, prawcore.exceptions.PrawcoreException):
+        return
+
+    now = time.monotonic()
+    with _lock:
+        failure_times = _failure_times[domain]
+        failure_times[:] = [t for t in failure_times if now - t < _WINDOW_SECONDS]
+        failure_times.append(now)
+
+        if isinstance(error, _TRIP_IMMEDIATELY) or len(failure_times) >= _FAIL_MAX:
+            _open_until[domain] = now + _RESET_TIMEOUT
+            failure_times.clear()
+            print(f"🛑 Reddit API circuit for {domain} opened for {_RESET_TIMEOUT:.0f}s: {error}")
@@ -2,7 +2,11 @@ import re
 import pandas as pd
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from collections import defaultdict
-from transformers import pipeline
+try:
+    from utils.ner_pipeline import get_ner_pipeline
+except ImportError:
+    # Imported with utils/ itself on sys.path (classifiers do this)
+    from ner_pipeline import get_ner_pipeline
 import ast
 import warnings
 warnings.filterwarnings("ignore")
@@ -14,25 +18,9 @@ class TravelSentimentAnalyzer:
         self.analyzer = SentimentIntensityAnalyzer()
         print("✅ VADER sentiment analyzer loaded successfully!")
         
-        # Initialize NER pipeline for destination extraction
-        try:
-            print("Loading optimized NER pipeline (dslim/bert-base-NER)...")
-            self.ner_pipeline = pipeline("ner", 
-                                        model="dslim/bert-base-NER",
-                                        aggregation_strategy="simple")
-            self.use_ner = True
-            print("✅ Optimized NER pipeline loaded successfully!")
-        except Exception as e:
-            print(f"⚠️  Could not load optimized NER pipeline: {e}")
-            print("Falling back to default model...")
-            try:
-                self.ner_pipeline = pipeline("ner", aggregation_strategy="simple")
-                self.use_ner = True
-                print("✅ Fallback NER pipeline loaded!")
-            except Exception as e2:
-                print(f"❌ Could not load any NER pipeline: {e2}")
-                self.ner_pipeline = None
-                self.use_ner = False
+        # Shared NER pipeline for destination extraction (loaded once per process)
+        self.ner_pipeline = get_ner_pipeline()
+        self.use_ner = self.ner_pipeline is not None
         
         # Popular travel destinations seed list
         self.popular_destinations = {